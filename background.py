@@ -0,0 +1,221 @@
+import io
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from dataframe import DataFrame, read_csv
+from store import freeze, store
+
+
+class Job:
+    """A unit of background work with progress and partial results the UI can poll."""
+
+    def __init__(self, key):
+        self.key = key
+        self.future = None
+        self.progress = 0.0
+        self.status = "Queued"
+        self.partial = {}
+        self._lock = threading.Lock()
+
+    def update(self, progress=None, status=None, **partial):
+        """Called from the worker thread to publish progress and partial results."""
+        with self._lock:
+            if progress is not None:
+                self.progress = progress
+            if status is not None:
+                self.status = status
+            self.partial.update(partial)
+
+    def snapshot(self):
+        """Return (progress, status, partial) as seen at one point in time."""
+        with self._lock:
+            return self.progress, self.status, dict(self.partial)
+
+    def done(self):
+        return self.future.done()
+
+    def failed(self):
+        return self.error() is not None
+
+    def error(self):
+        """The exception the job raised, or None while running or after success."""
+        return self.future.exception() if self.future.done() else None
+
+    def result(self):
+        return self.future.result()
+
+
+class JobManager:
+    """Runs jobs on a thread pool and keeps finished results so later reruns reuse them."""
+
+    def __init__(self, max_workers=2, max_jobs=16):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_jobs = max_jobs
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, func, *args, retry=False, **kwargs):
+        """Start func(job, *args, **kwargs) unless a job with this key already exists.
+        Failed jobs are kept so their error can be shown; pass retry=True to run them again.
+        """
+        with self._lock:
+            job = self.jobs.get(key)
+            if job is not None and not (retry and job.failed()):
+                # move to the end so it is evicted last
+                self.jobs[key] = self.jobs.pop(key)
+                return job
+
+            job = Job(key)
+            job.future = self.executor.submit(func, job, *args, **kwargs)
+            self.jobs.pop(key, None)
+            self.jobs[key] = job
+
+            # drop the oldest finished jobs once over the limit
+            for old_key in list(self.jobs):
+                if len(self.jobs) <= self.max_jobs:
+                    break
+                if self.jobs[old_key].done():
+                    del self.jobs[old_key]
+            return job
+
+    def get(self, key):
+        with self._lock:
+            return self.jobs.get(key)
+
+    def forget(self, key):
+        """Drop a job once its result has been handed off elsewhere."""
+        with self._lock:
+            self.jobs.pop(key, None)
+
+
+manager = JobManager()
+
+
+def forget_dataset_jobs(key):
+    """Drop jobs for a dataset the store evicted so they stop holding its frames."""
+    manager.forget(("load", key))
+    manager.forget(("join", key))
+
+
+store.on_evict = forget_dataset_jobs
+
+
+# helper functions
+def content_key(data):
+    """Hash raw file bytes so the same upload maps to the same cached jobs."""
+    return hashlib.sha1(data).hexdigest()
+
+
+def count_values(values):
+    """Return [{'value', 'count'}] rows sorted by count, descending."""
+    counts = {}
+    for v in values:
+        counts[v] = counts.get(v, 0) + 1
+    rows = [{"value": k, "count": counts[k]} for k in counts]
+    rows.sort(key=lambda x: x["count"], reverse=True)
+    return rows
+
+
+def track_rollup(df):
+    """Aggregate listens and msPlayed per track (used by the Join page)."""
+    missing = [col for col in ("trackName", "artistName", "msPlayed") if col not in df.columns]
+    if missing:
+        raise ValueError(f"Join needs columns missing from this file: {', '.join(missing)}")
+
+    grouped = df.group_by("trackName")
+
+    agg_rows = []
+    for track, gdf in grouped.items():
+        artist = gdf["artistName"][0] if "artistName" in gdf.columns else None
+        listens = gdf.aggregate("trackName", lambda col: len(col))
+        ms = gdf.aggregate("msPlayed", lambda col: sum(int(v) for v in col))
+
+        agg_rows.append({
+            "trackName": track,
+            "artistName": artist,
+            "listens": listens,
+            "msPlayed": ms,
+        })
+
+    agg_rows.sort(key=lambda x: x["listens"], reverse=True)
+
+    return DataFrame(
+        {
+            "trackName": [r["trackName"] for r in agg_rows],
+            "artistName": [r["artistName"] for r in agg_rows],
+            "listens": [r["listens"] for r in agg_rows],
+            "msPlayed": [r["msPlayed"] for r in agg_rows],
+        }
+    )
+
+
+# job functions, run in worker threads so they must not call streamlit
+def load_job(job, source):
+    """Parse a CSV (path or raw bytes) then compute the leaderboards."""
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    counts = {}
+    counted = 0
+
+    def on_progress(done, total, columns):
+        # provisional leaderboard, only counting rows parsed since the last call
+        nonlocal counted
+        artists = columns.get("artistName", []) if columns else []
+        for v in artists[counted:]:
+            counts[v] = counts.get(v, 0) + 1
+        counted = len(artists)
+        top = sorted(counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        job.update(
+            progress=0.8 * done / max(total, 1),
+            status=f"Parsed {done:,} of {total:,} lines",
+            rows=counted,
+            leaderboard=[{"value": k, "count": n} for k, n in top],
+        )
+
+    # tuple columns so the result can be shared read-only by every session
+    df = freeze(read_csv(source, progress=on_progress))
+
+    job.update(progress=0.9, status="Computing leaderboards")
+    leaderboards = {
+        col: freeze(DataFrame.from_rows(count_values(df.data[col])))
+        for col in ("artistName", "trackName")
+        if col in df.data
+    }
+
+    job.update(progress=1.0, status="Done", rows=df.num_rows)
+    return {"df": df, "leaderboards": leaderboards}
+
+
+def join_job(job, df, youtube_df):
+    """Roll up listens per track, then substring-join with the YouTube data keeping rows where artist == channel."""
+    job.update(status="Aggregating tracks")
+    agg_df = freeze(track_rollup(df))
+    # shown while the match is still running
+    job.update(tracks=agg_df)
+
+    def on_progress(done, total):
+        job.update(progress=done / max(total, 1), status=f"Matched {done:,} of {total:,} tracks")
+
+    joined_df = agg_df.join(
+        youtube_df,
+        left_on="trackName",
+        right_on="title",
+        how="inner",
+        substring=True,
+        progress=on_progress,
+    )
+
+    filtered = {col: [] for col in joined_df.columns}
+
+    for i in range(joined_df.num_rows):
+        artist = str(joined_df["artistName"][i]).lower().strip()
+        channel = str(joined_df["channel"][i]).lower().strip()
+
+        if artist == channel:
+            for col in joined_df.columns:
+                filtered[col].append(joined_df[col][i])
+
+    job.update(progress=1.0, status="Done")
+    return {"tracks": agg_df, "joined": freeze(DataFrame(filtered))}
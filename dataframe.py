@@ -1,5 +1,9 @@
 import re
 import math
+from datetime import date
+
+# bump when parsing or aggregation output changes so cached datasets are rebuilt
+CACHE_VERSION = 2
 
 class DataFrame:
     def __init__(self, data):
@@ -115,9 +119,153 @@ class DataFrame:
     def aggregate(self, col, func):
         """Apply an aggregate function to a single column."""
         return func(self.data[col])
-    
-    def join(self,other,on=None,left_on=None,right_on=None,how="inner",lsuffix="_x",rsuffix="_y",substring=False):
-        """Apply a join between 2 columns, optionally using substring matching."""
+
+    def time_parts(self, column="endTime"):
+        """Return a new DataFrame with hour, weekday (0=Mon) and month (YYYY-MM) columns
+        derived from a 'YYYY-MM-DD HH:MM' timestamp column.
+        """
+        if column not in self.data:
+            raise KeyError(f"Column '{column}' not found.")
+
+        hours, weekdays, months = [], [], []
+        # cache per date string, a listening history only spans a few hundred days
+        day_cache = {}
+        for val in self.data[column]:
+            text = str(val)
+            day = text[:10]
+            if day not in day_cache:
+                try:
+                    day_cache[day] = (date.fromisoformat(day).weekday(), day[:7])
+                except ValueError:
+                    day_cache[day] = (None, None)
+            weekday, month = day_cache[day]
+            try:
+                hour = int(text[11:13])
+            except ValueError:
+                hour = None
+            hours.append(hour)
+            weekdays.append(weekday)
+            months.append(month)
+
+        new_data = dict(self.data)
+        new_data["hour"] = hours
+        new_data["weekday"] = weekdays
+        new_data["month"] = months
+        return DataFrame(new_data)
+
+    def pivot_table(self, index, columns, values=None, aggfunc="count", fill_value=0):
+        """Build a dense 2-D aggregate in a single pass over the rows.
+        aggfunc is one of 'count', 'sum', 'mean', 'min', 'max' or a function applied to each cell's values.
+        None and "" values are skipped, and sum/mean/min/max convert the rest to numbers.
+        Cells with no values get fill_value (default 0), for every aggfunc.
+        Returns a DataFrame with the index column followed by one column per distinct column key.
+        """
+        for col in (index, columns):
+            if col not in self.data:
+                raise KeyError(f"Column '{col}' not found.")
+        if values is None and aggfunc != "count":
+            raise ValueError("Must specify 'values' unless aggfunc is 'count'.")
+        if values is not None and values not in self.data:
+            raise KeyError(f"Column '{values}' not found.")
+        builtin = aggfunc in ("count", "sum", "mean", "min", "max")
+        if not builtin and not callable(aggfunc):
+            raise ValueError("aggfunc must be one of: 'count', 'sum', 'mean', 'min', 'max' or a function")
+
+        # hashed key -> slot mapping, each row's cells grow in place as new column keys appear
+        row_slots = {}
+        col_slots = {}
+        cells = []
+        counts = []
+        index_vals = self.data[index]
+        column_vals = self.data[columns]
+        value_vals = self.data[values] if values is not None else None
+
+        for i in range(self.num_rows):
+            rk = index_vals[i]
+            ck = column_vals[i]
+            if rk is None or ck is None:
+                continue
+            if aggfunc != "count":
+                v = value_vals[i]
+                # read_csv leaves empty fields as ""
+                if v is None or v == "":
+                    continue
+                if builtin and not isinstance(v, (int, float)):
+                    try:
+                        v = int(v)
+                    except ValueError:
+                        v = float(v)
+
+            c = col_slots.get(ck)
+            if c is None:
+                c = col_slots[ck] = len(col_slots)
+            r = row_slots.get(rk)
+            if r is None:
+                r = row_slots[rk] = len(row_slots)
+                cells.append([])
+                counts.append([])
+            row_cells = cells[r]
+            row_counts = counts[r]
+            if c >= len(row_counts):
+                row_cells.extend([None] * (c + 1 - len(row_cells)))
+                row_counts.extend([0] * (c + 1 - len(row_counts)))
+
+            row_counts[c] += 1
+            if aggfunc == "count":
+                continue
+            if not builtin:
+                if row_cells[c] is None:
+                    row_cells[c] = []
+                row_cells[c].append(v)
+            elif aggfunc in ("sum", "mean"):
+                row_cells[c] = v if row_cells[c] is None else row_cells[c] + v
+            elif aggfunc == "min":
+                row_cells[c] = v if row_cells[c] is None or v < row_cells[c] else row_cells[c]
+            else:
+                row_cells[c] = v if row_cells[c] is None or v > row_cells[c] else row_cells[c]
+
+        # order rows/columns by key where the keys are comparable
+        def ordered(slots):
+            try:
+                return sorted(slots)
+            except TypeError:
+                return list(slots)
+
+        row_keys = ordered(row_slots)
+        col_keys = ordered(col_slots)
+
+        # column keys become column names, they must not clash with each other or the index
+        names = [str(ck) for ck in col_keys]
+        seen = {index}
+        for ck, name in zip(col_keys, names):
+            if name in seen:
+                raise ValueError(f"Column key {ck!r} clashes with another column named '{name}'.")
+            seen.add(name)
+
+        result = {index: row_keys}
+        for ck, name in zip(col_keys, names):
+            c = col_slots[ck]
+            out = []
+            for rk in row_keys:
+                r = row_slots[rk]
+                n = counts[r][c] if c < len(counts[r]) else 0
+                if n == 0:
+                    out.append(fill_value)
+                elif aggfunc == "count":
+                    out.append(n)
+                elif aggfunc == "mean":
+                    out.append(cells[r][c] / n)
+                elif builtin:
+                    out.append(cells[r][c])
+                else:
+                    out.append(aggfunc(cells[r][c]))
+            result[name] = out
+        return DataFrame(result)
+
+    def join(self,other,on=None,left_on=None,right_on=None,how="inner",lsuffix="_x",rsuffix="_y",substring=False,progress=None):
+        """Apply a join between 2 columns, optionally using substring matching.
+        If given, progress(rows_done, total_rows) is called after each left row of a substring join.
+        """
 
         # handle parameter compatibility
         if on is not None and (left_on is not None or right_on is not None):
@@ -191,6 +339,8 @@ class DataFrame:
                         matched = True
                 if not matched and how in ("left", "outer"):
                     matches.append((li, None))
+                if progress is not None:
+                    progress(li + 1, self.num_rows)
 
         else:
             # exact matching
@@ -257,9 +407,10 @@ def convert_value(val):
             return val
 
 
-def read_csv(source, sep=","):
+def read_csv(source, sep=",", progress=None, chunk_size=5000):
     """Read a CSV file into a DataFrame (handles quotes and numeric types).
     Works with both file paths and file-like objects (e.g., UploadedFile).
+    If given, progress(lines_done, total_lines, columns) is called every chunk_size lines.
     """
     pattern = re.compile(
         r'''
@@ -309,4 +460,10 @@ def read_csv(source, sep=","):
             for h, v in zip(header, values):
                 columns[h].append(v)
 
+        if progress is not None and i % chunk_size == 0:
+            progress(i + 1, len(lines), columns)
+
+    if progress is not None:
+        progress(len(lines), len(lines), columns)
+
     return DataFrame(columns)
@@ -1,21 +1,59 @@
+import time
+
+# measured per rerun (imports included) and reported in the sidebar on the next one,
+# so reruns that end in stop() / rerun() are counted too
+rerun_start = time.perf_counter()
+
 import streamlit as st
-import matplotlib.pyplot as plt
-import matplotlib as mpl
-import importlib
-import dataframe
-from dataframe import read_csv
-
-# configure
-plt.rcParams["mathtext.default"] = "regular"
-mpl.rcParams["text.usetex"] = False
-
-# reloads library in app
-importlib.reload(dataframe)
-
-# youtube data for join step
-youtube_df = read_csv("Data/Top_Songs_YouTube.csv").select(
-    ["title", "view_count", "channel", "channel_follower_count"]
-)
+import uuid
+import background
+import timing
+from dataframe import read_csv, CACHE_VERSION
+from store import store, freeze
+
+RERUN_BUDGET_MS = 500
+# first script run in the process, which also pays for importing the app modules
+COLD_START_BUDGET_MS = 2000
+
+# datasets are shared between sessions through the process-wide store
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex)
+
+
+def record_timing():
+    """Store how long this rerun took, and the cold start if this is the process' first run."""
+    elapsed_ms = (time.perf_counter() - rerun_start) * 1000
+    st.session_state["last_rerun_ms"] = elapsed_ms
+    timing.record_first_render(elapsed_ms)
+
+
+def stop():
+    record_timing()
+    st.stop()
+
+
+def rerun(delay=0):
+    """Rerun the script, optionally after a pause while background jobs make progress."""
+    record_timing()
+    time.sleep(delay)
+    st.rerun()
+
+
+def pyplot():
+    """Import and configure matplotlib on first use, only the Plot and Heatmap pages need it."""
+    import matplotlib as mpl
+    import matplotlib.pyplot as plt
+
+    plt.rcParams["mathtext.default"] = "regular"
+    mpl.rcParams["text.usetex"] = False
+    return plt
+
+
+def load_youtube():
+    """YouTube data for join step, parsed once by whichever session first opens the Join page."""
+    return freeze(read_csv("Data/Top_Songs_YouTube.csv").select(
+        ["title", "view_count", "channel", "channel_follower_count"]
+    ))
+
 
 # main title for app
 st.set_page_config(
@@ -34,6 +72,7 @@ option = st.sidebar.radio(
         "Listening Leaderboard",
         "Filter",
         "Plot",
+        "Heatmap",
         "Join",
         "About",
         "Download and Convert Listening Data"
@@ -41,6 +80,15 @@ option = st.sidebar.radio(
     label_visibility="collapsed"   # hides label from UI
 )
 
+# timings, flagged when over budget
+last_rerun_ms = st.session_state.get("last_rerun_ms")
+if last_rerun_ms is not None:
+    flag = "⚠️ " if last_rerun_ms > RERUN_BUDGET_MS else ""
+    st.sidebar.caption(f"{flag}Last rerun: {last_rerun_ms:.0f} ms (budget {RERUN_BUDGET_MS} ms)")
+if timing.first_render_ms is not None:
+    flag = "⚠️ " if timing.first_render_ms > COLD_START_BUDGET_MS else ""
+    st.sidebar.caption(f"{flag}Cold start: {timing.first_render_ms:.0f} ms (budget {COLD_START_BUDGET_MS} ms)")
+
 # header
 st.markdown(
     """
@@ -127,6 +175,10 @@ elif option == "About":
                 <b>Plot:</b> Leverages developed <i>group_by</i> method in the 
                 <b><u>DataFrame</u></b> class.
             </p>
+            <p>
+                <b>Heatmap:</b> Leverages developed <i>time_parts</i> and <i>pivot_table</i> methods in the 
+                <b><u>DataFrame</u></b> class.
+            </p>
             <p>
                 <b>Join:</b> Leverages developed <i>join, aggregate & group_by</i> methods in the 
                 <b><u>DataFrame</u></b> class.
@@ -143,17 +195,16 @@ else:
     use_default = st.checkbox("Use default dataset (Data/streaming_history.csv)")
 
     df = None
+    data_key = None
+    source = None
     
     # use default data
-    # leverages read_csv function in dataframe class
+    # parsing and rollups run in a background worker, see background.load_job
     if use_default:
-        try:
-            df = read_csv("Data/streaming_history.csv")
-            st.success("Loaded default dataset successfully!")
-        except Exception as e:
-            st.error(f"Failed to load default data: {e}")
+        data_key = (CACHE_VERSION, "default")
+        source = "Data/streaming_history.csv"
     # use uploaded data
-    # leverages read_csv function in dataframe class
+    # same content hash -> same dataset, so sessions uploading the same file share it
     else:
         uploaded_file = st.file_uploader(
             "Upload your Spotify listening CSV",
@@ -161,12 +212,53 @@ else:
         )
 
         if uploaded_file is not None:
-            df = read_csv(uploaded_file)
-            st.success("File uploaded successfully!")
+            source = uploaded_file.getvalue()
+            # hash each upload once, not on every polling rerun
+            hashed = st.session_state.get("upload_hash")
+            if hashed is None or hashed[0] != uploaded_file.file_id:
+                hashed = (uploaded_file.file_id, background.content_key(source))
+                st.session_state["upload_hash"] = hashed
+            data_key = (CACHE_VERSION, hashed[1])
+
+    # let the store evict the dataset this session was using before
+    previous_key = st.session_state.get("data_key")
+    if previous_key is not None and previous_key != data_key:
+        store.release(session_id, previous_key)
+    st.session_state["data_key"] = data_key
+
     # warning message to user to select option
-    if df is None:
+    if data_key is None:
         st.warning("Please upload a file or use the default dataset.")
-        st.stop()
+        stop()
+
+    # already parsed by this or another session
+    loaded = store.acquire(session_id, data_key)
+
+    # otherwise parse in the background, showing progress and a provisional leaderboard
+    if loaded is None:
+        # a failed job stays failed until the user retries or picks another file
+        load_job = background.manager.submit(("load", data_key), background.load_job, source)
+        if load_job.failed():
+            st.error(f"Failed to load data: {load_job.error()}")
+            if st.button("Retry loading"):
+                background.manager.submit(("load", data_key), background.load_job, source, retry=True)
+                rerun()
+            stop()
+
+        if not load_job.done():
+            progress, status, partial = load_job.snapshot()
+            st.progress(progress, text=status)
+            if partial.get("leaderboard"):
+                st.subheader(f"⏳ Provisional Top Artists ({partial['rows']:,} rows so far)")
+                st.table(partial["leaderboard"])
+            rerun(delay=0.5)
+
+        loaded = store.acquire(session_id, data_key, load_job.result)
+        # the store owns the parsed data from here on
+        background.manager.forget(("load", data_key))
+
+    df = loaded["df"]
+    st.success(f"Loaded {df.num_rows:,} rows successfully!")
 
     # data preview
     # uses aggregate method
@@ -211,19 +303,12 @@ else:
     elif option == "Listening Leaderboard":
         st.subheader("🏆 Top Artist / Track by Listens")
         col = st.selectbox("Select column:", ["artistName", "trackName"])
-        values = df.data[col]
-
-        counts = {}
-        for v in values:
-            counts[v] = counts.get(v, 0) + 1
 
-        rows = [
-            {"value": k, "count": counts[k]}
-            for k in counts
-        ]
-
-        rows.sort(key=lambda x: x["count"], reverse=True)
-        st.table(rows)
+        # counted in the background right after parsing
+        if col not in loaded["leaderboards"]:
+            st.warning(f"This file has no '{col}' column.")
+        else:
+            st.table(loaded["leaderboards"][col].to_rows())
 
     # filter
     # uses filter, select 
@@ -268,6 +353,7 @@ else:
     # uses group_by, aggregate
     elif option == "Plot":
         st.subheader("📊 Plot Data")
+        plt = pyplot()
 
         plot_type = st.selectbox("Select plot type:",["Bar Chart 📊", "Pie Chart 🥧", "Line Chart 📈"])
 
@@ -353,65 +439,130 @@ else:
             plt.yticks(color="white")
             st.pyplot(fig)
 
+    # heatmap
+    # uses time_parts, pivot_table
+    elif option == "Heatmap":
+        st.subheader("🗓️ Listening Heatmap")
+        plt = pyplot()
+
+        heatmap_type = st.selectbox("Select heatmap:", ["Hour of Day × Weekday", "Artist × Month"])
+        selected_num = st.selectbox("Measure:", ["listens", "msPlayed"])
+
+        if heatmap_type == "Hour of Day × Weekday":
+            index_col, column_col = "weekday", "hour"
+        else:
+            index_col, column_col = "artistName", "month"
+
+        def time_parts(loaded):
+            return freeze(loaded["df"].time_parts("endTime"))
+
+        def heatmap(loaded):
+            # time parts are derived once per dataset and shared by every heatmap
+            parts_df = store.derive(session_id, data_key, "time_parts", time_parts)
+            if selected_num == "listens":
+                pivot = parts_df.pivot_table(index_col, column_col, aggfunc="count")
+            else:
+                pivot = parts_df.pivot_table(index_col, column_col, values="msPlayed", aggfunc="sum")
+
+            matrix = tuple(
+                tuple(pivot[c][r] for c in pivot.columns[1:])
+                for r in range(pivot.num_rows)
+            )
+            return {
+                "row_labels": tuple(pivot[index_col]),
+                "col_labels": tuple(pivot.columns[1:]),
+                "matrix": matrix,
+                # row order by total, used to pick the top artists
+                "ranked": tuple(sorted(range(len(matrix)), key=lambda r: sum(matrix[r]), reverse=True)),
+            }
+
+        # computed once per dataset and choice, widget changes only re-render
+        try:
+            cached = store.derive(session_id, data_key, ("heatmap", index_col, column_col, selected_num), heatmap)
+        except (KeyError, ValueError) as e:
+            st.error(f"Cannot build heatmap: {e}")
+            stop()
+
+        col_labels = cached["col_labels"]
+        row_labels = cached["row_labels"]
+        matrix = cached["matrix"]
+
+        if heatmap_type == "Hour of Day × Weekday":
+            weekday_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+            row_labels = [weekday_names[d] for d in row_labels]
+        else:
+            # keep the top artists by total so the chart stays readable
+            top_n = st.slider("Number of artists:", min_value=5, max_value=50, value=20)
+            ranked = cached["ranked"][:top_n]
+            row_labels = [str(row_labels[r])[:25].replace("$", "\\$") for r in ranked]
+            matrix = [matrix[r] for r in ranked]
+
+        if not matrix:
+            st.warning("No timestamps to plot.")
+            stop()
+
+        fig, ax = plt.subplots(figsize=(12, max(4, len(row_labels) * 0.35)))
+        fig.patch.set_facecolor("#000")
+        ax.set_facecolor("#121212")
+        im = ax.imshow(matrix, aspect="auto", cmap="Greens")
+
+        ax.set_xticks(range(len(col_labels)))
+        ax.set_xticklabels(col_labels, rotation=45, ha="right", color="white")
+        ax.set_yticks(range(len(row_labels)))
+        ax.set_yticklabels(row_labels, color="white")
+        ax.set_xlabel(column_col, color="white")
+        ax.set_title(f"{selected_num} by {index_col} × {column_col}", color="white")
+
+        cbar = fig.colorbar(im, ax=ax)
+        cbar.ax.yaxis.set_tick_params(color="white")
+        plt.setp(cbar.ax.get_yticklabels(), color="white")
+        st.pyplot(fig)
+
     # join
     # uses group_by, aggregate
     elif option == "Join":
         st.subheader("🔗 Join Streaming Data with YouTube Top Songs")
 
+        youtube_df = store.acquire(session_id, (CACHE_VERSION, "youtube"), load_youtube)
+
         st.subheader("YouTube Data Preview")
         st.table(youtube_df.to_rows(10))
 
-        grouped = df.group_by("trackName")
-
-        agg_rows = []
-        for track, gdf in grouped.items():
-            artist = gdf["artistName"][0] if "artistName" in gdf.columns else None
-            listens = gdf.aggregate("trackName", lambda col: len(col))
-            ms = gdf.aggregate("msPlayed", lambda col: sum(int(v) for v in col))
-
-            agg_rows.append({
-                "trackName": track,
-                "artistName": artist,
-                "listens": listens,
-                "msPlayed": ms,
-            })
-
-        agg_rows.sort(key=lambda x: x["listens"], reverse=True)
-
-        agg_df = dataframe.DataFrame(
-            {
-                "trackName": [r["trackName"] for r in agg_rows],
-                "artistName": [r["artistName"] for r in agg_rows],
-                "listens": [r["listens"] for r in agg_rows],
-                "msPlayed": [r["msPlayed"] for r in agg_rows],
-            }
-        )
+        # already joined by this or another session
+        joined = store.derive(session_id, data_key, "join")
+
+        # the track rollup and substring match are the slow part, run them in the background with progress
+        if joined is None:
+            join_job = background.manager.submit(("join", data_key), background.join_job, df, youtube_df)
+            if join_job.failed():
+                st.error(f"Join failed: {join_job.error()}")
+                if st.button("Retry join"):
+                    background.manager.submit(("join", data_key), background.join_job, df, youtube_df, retry=True)
+                    rerun()
+                stop()
+
+            if not join_job.done():
+                progress, status, partial = join_job.snapshot()
+                if partial.get("tracks") is not None:
+                    st.subheader("Aggregated Data Preview")
+                    st.table(partial["tracks"].to_rows(10))
+                st.progress(progress, text=status)
+                rerun(delay=0.5)
+
+            joined = store.derive(session_id, data_key, "join", lambda _: join_job.result())
+            # the store owns the result from here on and drops it with the dataset
+            background.manager.forget(("join", data_key))
 
         st.subheader("Aggregated Data Preview")
-        st.table(agg_df.to_rows(10))
-
-        joined_df = agg_df.join(
-            youtube_df,
-            left_on="trackName",
-            right_on="title",
-            how="inner",
-            substring=True,
-        )
-
-        filtered = {col: [] for col in joined_df.columns}
+        st.table(joined["tracks"].to_rows(10))
 
-        for i in range(joined_df.num_rows):
-            artist = str(joined_df["artistName"][i]).lower().strip()
-            channel = str(joined_df["channel"][i]).lower().strip()
-
-            if artist == channel:
-                for col in joined_df.columns:
-                    filtered[col].append(joined_df[col][i])
-
-        joined_df = dataframe.DataFrame(filtered)
+        joined_df = joined["joined"]
 
         st.subheader("Final Joined Results")
         if joined_df.num_rows == 0:
             st.warning("No matching rows.")
         else:
             st.table(joined_df.to_rows(15))
+
+# reported in the sidebar on the next rerun
+record_timing()
@@ -0,0 +1,131 @@
+import time
+import threading
+
+from dataframe import DataFrame
+
+# marks "not stored yet", None can be a real value
+_MISSING = object()
+
+# helper functions
+def freeze(df):
+    """Return a DataFrame whose columns are immutable tuples, safe to share between sessions."""
+    return DataFrame({col: tuple(values) for col, values in df.data.items()})
+
+
+def view(value):
+    """Give a session its own column dict over the shared (frozen) column tuples."""
+    if isinstance(value, DataFrame):
+        return DataFrame(dict(value.data))
+    if isinstance(value, dict):
+        return {k: view(v) for k, v in value.items()}
+    return value
+
+
+class DatasetStore:
+    """Process-wide datasets loaded once and shared by every Streamlit session.
+
+    Sessions are reference counted per dataset; a session that has not touched a
+    dataset for `ttl` seconds is dropped, and datasets nobody holds are evicted
+    together with everything derived from them.
+    """
+
+    def __init__(self, ttl=30 * 60, on_evict=None):
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.datasets = {}
+        self.derived = {}  # key -> {name: value computed from the dataset}
+        self.holders = {}  # key -> {session_id: last seen}
+        self._load_locks = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, session_id, key, loader=None):
+        """Return a view of dataset `key`, loading it with loader() if it is not stored yet.
+        Returns None when the dataset is not stored and no loader is given.
+        """
+        with self._lock:
+            self._sweep()
+            # hold before looking so a concurrent release cannot evict it under us
+            self._hold(session_id, key)
+            if key in self.datasets:
+                return view(self.datasets[key])
+            if loader is None:
+                return None
+
+        value = self._load_once(key, lambda: self.datasets.get(key, _MISSING), loader)
+        with self._lock:
+            # only keep it if a session still holds it, all of them may have released it while loading
+            if key in self.holders and key not in self.datasets:
+                self.datasets[key] = value
+        return view(value)
+
+    def derive(self, session_id, key, name, func=None):
+        """Return a view of func(dataset) for a stored dataset, computed once and evicted with it.
+        Returns None when it has not been computed yet and no func is given.
+        """
+        with self._lock:
+            self._hold(session_id, key)
+            if key not in self.datasets:
+                raise KeyError(f"Dataset {key!r} is not loaded.")
+            derived = self.derived.setdefault(key, {})
+            if name in derived:
+                return view(derived[name])
+            if func is None:
+                return None
+            dataset = self.datasets[key]
+
+        value = self._load_once(
+            (key, name),
+            lambda: self.derived.get(key, {}).get(name, _MISSING),
+            lambda: func(dataset),
+        )
+        with self._lock:
+            if key in self.datasets:
+                self.derived.setdefault(key, {}).setdefault(name, value)
+        return view(value)
+
+    def release(self, session_id, key):
+        """Drop a session's hold on a dataset, evicting it if no session is left."""
+        with self._lock:
+            sessions = self.holders.get(key, {})
+            sessions.pop(session_id, None)
+            if not sessions:
+                self._evict(key)
+
+    def _load_once(self, lock_key, lookup, loader):
+        """Run loader() outside the store lock, at most once at a time per lock_key."""
+        with self._lock:
+            load_lock = self._load_locks.setdefault(lock_key, threading.Lock())
+        try:
+            with load_lock:
+                with self._lock:
+                    value = lookup()
+                if value is _MISSING:
+                    value = loader()
+                return value
+        finally:
+            with self._lock:
+                self._load_locks.pop(lock_key, None)
+
+    def _hold(self, session_id, key):
+        self.holders.setdefault(key, {})[session_id] = time.monotonic()
+
+    def _sweep(self):
+        """Forget idle sessions and evict datasets that no session holds."""
+        cutoff = time.monotonic() - self.ttl
+        for key in list(self.holders):
+            sessions = self.holders[key]
+            for session_id in [s for s, seen in sessions.items() if seen < cutoff]:
+                del sessions[session_id]
+            if not sessions:
+                self._evict(key)
+        for key in [k for k in self.datasets if k not in self.holders]:
+            self._evict(key)
+
+    def _evict(self, key):
+        self.holders.pop(key, None)
+        self.derived.pop(key, None)
+        if self.datasets.pop(key, _MISSING) is not _MISSING and self.on_evict is not None:
+            self.on_evict(key)
+
+
+store = DatasetStore()
@@ -0,0 +1,80 @@
+import pytest
+
+from dataframe import DataFrame
+
+
+def listens():
+    return DataFrame({
+        "artist": ["A", "A", "A", "B", "B"],
+        "month": ["2024-10", "2024-10", "2024-11", "2024-10", "2024-10"],
+        "msPlayed": [100, 300, "50", "9", "10"],
+    })
+
+
+def test_pivot_count():
+    pivot = listens().pivot_table("artist", "month")
+    assert pivot.data == {"artist": ["A", "B"], "2024-10": [2, 2], "2024-11": [1, 0]}
+
+
+@pytest.mark.parametrize("aggfunc, expected", [
+    ("sum", {"2024-10": [400, 19], "2024-11": [50, 0]}),
+    ("mean", {"2024-10": [200, 9.5], "2024-11": [50, 0]}),
+    ("min", {"2024-10": [100, 9], "2024-11": [50, 0]}),
+    ("max", {"2024-10": [300, 10], "2024-11": [50, 0]}),
+])
+def test_pivot_builtin_aggfuncs_compare_numbers(aggfunc, expected):
+    pivot = listens().pivot_table("artist", "month", values="msPlayed", aggfunc=aggfunc)
+    assert pivot["artist"] == ["A", "B"]
+    for col, values in expected.items():
+        assert pivot[col] == values
+
+
+def test_pivot_callable_aggfunc_gets_cell_values():
+    pivot = listens().pivot_table("artist", "month", values="msPlayed", aggfunc=len)
+    assert pivot.data == {"artist": ["A", "B"], "2024-10": [2, 2], "2024-11": [1, 0]}
+
+
+def test_pivot_fill_value_for_empty_cells():
+    pivot = listens().pivot_table("artist", "month", values="msPlayed", aggfunc="max", fill_value=None)
+    assert pivot["2024-11"] == [50, None]
+
+
+def test_pivot_skips_none_and_empty_values():
+    df = DataFrame({
+        "artist": ["A", "A", "A", None],
+        "month": ["2024-10", "2024-10", "2024-10", "2024-10"],
+        "msPlayed": [10, "", None, 5],
+    })
+    assert df.pivot_table("artist", "month", values="msPlayed", aggfunc="mean").data == {
+        "artist": ["A"], "2024-10": [10.0],
+    }
+    assert df.pivot_table("artist", "month").data == {"artist": ["A"], "2024-10": [3]}
+
+
+def test_pivot_non_numeric_value_raises():
+    df = DataFrame({"i": [1, 1], "c": ["x", "x"], "v": [1, "x"]})
+    with pytest.raises(ValueError):
+        df.pivot_table("i", "c", values="v", aggfunc="max")
+
+
+@pytest.mark.parametrize("data", [
+    {"a": [1, 2], "b": ["a", "c"]},  # column key named like the index
+    {"a": [1, 2], "b": [1, "1"]},  # two keys with the same name
+])
+def test_pivot_rejects_clashing_column_names(data):
+    with pytest.raises(ValueError):
+        DataFrame(data).pivot_table("a", "b")
+
+
+def test_time_parts():
+    df = DataFrame({"endTime": ["2024-10-04 15:59", "2024-10-07 09:31"]}).time_parts()
+    assert df["hour"] == [15, 9]
+    assert df["weekday"] == [4, 0]
+    assert df["month"] == ["2024-10", "2024-10"]
+
+
+def test_time_parts_unparseable_timestamps():
+    df = DataFrame({"endTime": ["not a date", "", None, "2024-13-01 xx:00"]}).time_parts()
+    assert df["hour"] == [None, None, None, None]
+    assert df["weekday"] == [None, None, None, None]
+    assert df["month"] == [None, None, None, None]
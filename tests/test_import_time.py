@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# measured around 12 ms, generous so slow CI machines don't flake
+IMPORT_BUDGET_US = 100_000
+
+
+def import_times(module):
+    """Run `python -X importtime -c "import <module>"` and return {module name: cumulative us}."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_dataframe_import_is_fast():
+    times = import_times("dataframe")
+    assert times["dataframe"] < IMPORT_BUDGET_US
+
+
+def test_dataframe_does_not_import_heavy_dependencies():
+    times = import_times("dataframe")
+    heavy = [name for name in times if name.split(".")[0] in ("matplotlib", "streamlit")]
+    assert heavy == []
@@ -0,0 +1,103 @@
+import threading
+import time
+
+from dataframe import DataFrame
+from store import DatasetStore, freeze
+
+
+def load_counter():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return freeze(DataFrame({"artist": ["A", "B"], "msPlayed": [1, 2]}))
+
+    return loader, calls
+
+
+def test_acquire_loads_once_and_shares_columns():
+    store = DatasetStore()
+    loader, calls = load_counter()
+    a = store.acquire("s1", "k", loader)
+    b = store.acquire("s2", "k", loader)
+    assert len(calls) == 1
+    assert a["artist"] is b["artist"]
+    assert isinstance(a["artist"], tuple)
+    # each session gets its own column dict
+    assert a.data is not b.data
+
+
+def test_acquire_without_loader_returns_none():
+    assert DatasetStore().acquire("s1", "missing") is None
+
+
+def test_derive_computes_once_and_shares_result():
+    store = DatasetStore()
+    loader, _ = load_counter()
+    store.acquire("s1", "k", loader)
+    calls = []
+
+    def total(df):
+        calls.append(1)
+        return freeze(DataFrame({"total": [sum(df["msPlayed"])]}))
+
+    a = store.derive("s1", "k", "total", total)
+    b = store.derive("s2", "k", "total", total)
+    assert len(calls) == 1
+    assert a["total"] == (3,)
+    assert a["total"] is b["total"]
+    assert store.derive("s1", "k", "other") is None
+
+
+def test_release_evicts_dataset_and_derived_values():
+    evicted = []
+    store = DatasetStore(on_evict=evicted.append)
+    loader, _ = load_counter()
+    store.acquire("s1", "k", loader)
+    store.acquire("s2", "k", loader)
+    store.derive("s1", "k", "total", lambda df: 1)
+
+    store.release("s1", "k")
+    assert "k" in store.datasets
+    assert evicted == []
+
+    store.release("s2", "k")
+    assert store.datasets == {}
+    assert store.derived == {}
+    assert store.holders == {}
+    assert evicted == ["k"]
+
+
+def test_idle_sessions_expire_after_ttl():
+    store = DatasetStore(ttl=0.01)
+    loader, _ = load_counter()
+    store.acquire("s1", "k", loader)
+    time.sleep(0.02)
+    store.acquire("s2", "other", loader)
+    assert "k" not in store.datasets
+    assert "other" in store.datasets
+
+
+def test_release_during_load_does_not_leak():
+    store = DatasetStore()
+    started = threading.Event()
+    finish = threading.Event()
+
+    def slow_loader():
+        started.set()
+        finish.wait(5)
+        return freeze(DataFrame({"x": [1]}))
+
+    result = []
+    worker = threading.Thread(target=lambda: result.append(store.acquire("A", "k", slow_loader)))
+    worker.start()
+    started.wait(5)
+    store.release("A", "k")
+    finish.set()
+    worker.join(5)
+
+    # the caller still gets its data, but the store does not keep it
+    assert result[0]["x"] == (1,)
+    store._sweep()
+    assert store.datasets == {}
+    assert store.holders == {}
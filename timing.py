@@ -0,0 +1,11 @@
+# cold start: the first script run in this process, from the start of main.py
+# (its imports included) to the end of the run, set by main.py
+first_render_ms = None
+
+
+def record_first_render(elapsed_ms):
+    """Keep the duration of the first finished script run, later runs are ignored."""
+    global first_render_ms
+    if first_render_ms is None:
+        first_render_ms = elapsed_ms
+    return first_render_ms